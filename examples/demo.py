@@ -74,9 +74,9 @@ async def demo():
     
     # Demo 3: Show configuration
     print("📋 Demo 3: Configuration details...")
-    print(f"   Cache TTL: {monitor.config.settings['cache_ttl']}s")
-    print(f"   SSH timeout: {monitor.config.settings['ssh_timeout']}s")
-    print(f"   Max concurrent: {monitor.config.settings['max_concurrent']}")
+    print(f"   Cache TTL: {monitor.config.settings.cache_ttl}s")
+    print(f"   SSH timeout: {monitor.config.settings.ssh_timeout}s")
+    print(f"   Max concurrent: {monitor.config.settings.max_concurrent}")
     print()
     
     print("✅ Demo completed!")
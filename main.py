@@ -1,17 +1,17 @@
 """Main entry point for GPU Monitor."""
 
-from gpu_monitor.server import main as mcp_main
-from gpu_monitor.cli import main as cli_main
 import sys
 
 
 def main():
     """Entry point that routes to MCP server or CLI based on arguments."""
     if len(sys.argv) > 1 and sys.argv[1] in ['status', 'usage', 'kill', 'config', 'install']:
-        # CLI mode
+        # CLI mode - defer the import so CLI calls skip the MCP stack
+        from gpu_monitor.cli import main as cli_main
         cli_main()
     else:
         # MCP server mode
+        from gpu_monitor.server import main as mcp_main
         print("Starting GPU Monitor MCP Server...")
         print("Use 'uv run python main.py status' for CLI mode")
         print("Or use dedicated commands: 'uv run gpu-monitor status' or 'uv run gpu-mcp-server'")
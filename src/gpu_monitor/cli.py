@@ -1,76 +1,87 @@
 """CLI interface for GPU cluster monitoring (failure-safe standalone script)."""
 
 import asyncio
-import json
+import functools
 import os
 import sys
 from pathlib import Path
 from typing import Optional
 
 import click
+import orjson
 
 from .core import GPUMonitor
 from .models import ClusterStatus, UserUsageSummary
 
 
+@functools.cache
 def get_current_user() -> str:
-    """Get current user from environment."""
+    """Get current user from environment (cached; $USER is stable per process)."""
     return os.environ.get('USER', 'unknown')
 
 
-def format_gpu_status(status: ClusterStatus) -> str:
-    """Format GPU status for CLI output."""
-    output = []
-    output.append(f"🖥️  GPU Cluster Status ({status.online_servers}/{status.total_servers} servers online)")
-    output.append(f"📊 Total GPUs: {status.total_gpus}")
-    output.append("")
-    
+# Utilization decile -> emoji (0-29 green, 30-69 yellow, 70+ red); a
+# table index replaces the comparison chain in the per-GPU render loop
+_UTIL_EMOJI = ("\U0001F7E2",) * 3 + ("\U0001F7E1",) * 4 + ("\U0001F534",) * 4
+
+
+def _gpu_status_lines(status: ClusterStatus):
+    """Yield CLI output lines for a cluster status."""
+    yield f"🖥️  GPU Cluster Status ({status.online_servers}/{status.total_servers} servers online)"
+    yield f"📊 Total GPUs: {status.total_gpus}"
+    yield ""
+
     for server in status.servers:
         if server.online:
-            output.append(f"🟢 {server.server_id} ({server.hostname}) - {server.response_time_ms:.1f}ms")
-            
+            yield f"🟢 {server.server_id} ({server.hostname}) - {server.response_time_ms:.1f}ms"
+
             if not server.gpus:
-                output.append("   No GPU information available")
+                yield "   No GPU information available"
                 continue
-                
+
             for gpu in server.gpus:
-                utilization_emoji = "🟢" if gpu.utilization_percent < 30 else "🟡" if gpu.utilization_percent < 70 else "🔴"
+                utilization_emoji = _UTIL_EMOJI[min(gpu.utilization_percent // 10, 10)]
                 memory_gb = gpu.memory_total_mb / 1024
                 free_gb = gpu.memory_free_mb / 1024
-                output.append(f"   {utilization_emoji} GPU{gpu.index}: {gpu.utilization_percent}% util, {free_gb:.1f}/{memory_gb:.1f}GB free")
-            
+                yield f"   {utilization_emoji} GPU{gpu.index}: {gpu.utilization_percent}% util, {free_gb:.1f}/{memory_gb:.1f}GB free"
+
             if server.processes:
-                output.append(f"   👥 {len(server.processes)} active processes")
+                yield f"   👥 {len(server.processes)} active processes"
         else:
-            output.append(f"🔴 {server.server_id} ({server.hostname}) - OFFLINE")
+            yield f"🔴 {server.server_id} ({server.hostname}) - OFFLINE"
             if server.error_message:
-                output.append(f"   Error: {server.error_message}")
-        
-        output.append("")
-    
-    return "\n".join(output)
+                yield f"   Error: {server.error_message}"
 
+        yield ""
+
+
+def format_gpu_status(status: ClusterStatus) -> str:
+    """Format GPU status for CLI output."""
+    return "\n".join(_gpu_status_lines(status))
+
+
+def _user_usage_lines(usage: UserUsageSummary):
+    """Yield CLI output lines for a user usage summary."""
+    yield f"👤 GPU Usage for {usage.username}"
+    yield f"📊 {usage.total_processes} processes using {usage.total_memory_used_mb/1024:.1f}GB total"
+    yield f"🖥️  Active on: {', '.join(usage.servers_used) if usage.servers_used else 'None'}"
+    yield ""
 
-def format_user_usage(usage: UserUsageSummary) -> str:
-    """Format user usage for CLI output."""
-    output = []
-    output.append(f"👤 GPU Usage for {usage.username}")
-    output.append(f"📊 {usage.total_processes} processes using {usage.total_memory_used_mb/1024:.1f}GB total")
-    output.append(f"🖥️  Active on: {', '.join(usage.servers_used) if usage.servers_used else 'None'}")
-    output.append("")
-    
     if not usage.processes_by_server:
-        output.append("No active GPU processes found.")
-        return "\n".join(output)
-    
+        yield "No active GPU processes found."
+        return
+
     for server_id, processes in usage.processes_by_server.items():
-        output.append(f"🖥️  {server_id}:")
+        yield f"🖥️  {server_id}:"
         for proc in processes:
             memory_gb = proc.memory_used_mb / 1024
-            output.append(f"   • PID {proc.pid} on GPU{proc.gpu_index}: {memory_gb:.1f}GB - {proc.process_name}")
-        output.append("")
-    
-    return "\n".join(output)
+            yield f"   • PID {proc.pid} on GPU{proc.gpu_index}: {memory_gb:.1f}GB - {proc.process_name}"
+        yield ""
+
+
+def format_user_usage(usage: UserUsageSummary) -> str:
+    """Format user usage for CLI output."""
+    return "\n".join(_user_usage_lines(usage))
 
 
 @click.group()
@@ -89,12 +100,13 @@ def cli(ctx, config):
 def status(ctx, server, json_output):
     """Check GPU status for all servers or a specific server."""
     async def _status():
-        monitor = GPUMonitor(ctx.obj['config'])
+        monitor = GPUMonitor(ctx.obj['config'], persistent_cache=True)
         server_ids = [server] if server else None
         cluster_status = await monitor.get_cluster_status(server_ids)
         
         if json_output:
-            click.echo(cluster_status.model_dump_json(indent=2))
+            click.echo(orjson.dumps(cluster_status.model_dump(mode='json'),
+                                    option=orjson.OPT_INDENT_2).decode())
         else:
             click.echo(format_gpu_status(cluster_status))
     
@@ -111,12 +123,13 @@ def usage(ctx, user, server, json_output):
     username = user or get_current_user()
     
     async def _usage():
-        monitor = GPUMonitor(ctx.obj['config'])
+        monitor = GPUMonitor(ctx.obj['config'], persistent_cache=True)
         server_ids = [server] if server else None
         user_usage = await monitor.get_user_usage(username, server_ids)
         
         if json_output:
-            click.echo(user_usage.model_dump_json(indent=2))
+            click.echo(orjson.dumps(user_usage.model_dump(mode='json'),
+                                    option=orjson.OPT_INDENT_2).decode())
         else:
             click.echo(format_user_usage(user_usage))
     
@@ -134,7 +147,8 @@ def kill(ctx, user, server, confirm, dry_run):
     username = user or get_current_user()
     
     async def _kill():
-        monitor = GPUMonitor(ctx.obj['config'])
+        nonlocal confirm
+        monitor = GPUMonitor(ctx.obj['config'], persistent_cache=True)
         server_ids = [server] if server else None
         
         # First, show what processes would be killed
@@ -163,7 +177,10 @@ def kill(ctx, user, server, confirm, dry_run):
         
         if confirm:
             click.echo(f"\n💀 Killing processes for {username}...")
-            results = await monitor.kill_user_tasks(username, server_ids, confirm=True)
+            # Reuse the usage fetched for the prompt so we don't sweep
+            # the cluster a second time just to re-read the same PIDs
+            results = await monitor.kill_user_tasks(username, server_ids, confirm=True,
+                                                    usage=usage)
             
             for server_id, result in results.items():
                 if isinstance(result, str):
@@ -189,7 +206,7 @@ def config(ctx):
             click.echo(f"  • {server.id}: {server.hostname} - {server.description}")
         
         click.echo(f"\nSettings:")
-        for key, value in monitor.config.settings.items():
+        for key, value in dict(monitor.config.settings).items():
             click.echo(f"  • {key}: {value}")
             
     except Exception as e:
@@ -1,15 +1,22 @@
 """Core GPU monitoring functionality."""
 
 import asyncio
-import json
+import atexit
+import functools
+import os
 import re
-import subprocess
+import shutil
+import tempfile
 import time
-from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 import logging
 
+import asyncssh
+import orjson
+from cachetools import TLRUCache
+from diskcache import Cache
+
 from .models import (
     ClusterConfig, ServerConfig, ServerStatus, GPUInfo, 
     ProcessInfo, UserUsageSummary, ClusterStatus
@@ -17,15 +24,72 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Sentinel separating per-command output in batched SSH scripts
+_SCRIPT_SEP = "---SEP---"
+
+# Precompiled patterns for the legacy free-form parser
+_LEGACY_GPU_RE = re.compile(r'GPU (\d+).*?(\d+)%.*?(\d+)/(\d+)\s*MB')
+_LEGACY_PROC_RE = re.compile(r'PID\s+(\d+)\s+(\w+)\s+GPU:(\d+)\s+(\d+)MB\s+(.+)')
+
+# Single-shot status query shared by status refresh paths. GPU rows are
+# CSV (index, uuid, name, util, mem used/total, temp, power); process rows
+# are CSV (pid, username, gpu_uuid, used_memory, process_name) with the
+# username joined in from ps since --query-compute-apps does not report it.
+_GPU_QUERY = (
+    "nvidia-smi --query-gpu=index,uuid,name,utilization.gpu,memory.used,"
+    "memory.total,temperature.gpu,power.draw --format=csv,noheader,nounits"
+)
+_PROCESS_QUERY = (
+    "nvidia-smi --query-compute-apps=pid,gpu_uuid,used_memory,process_name"
+    " --format=csv,noheader,nounits"
+    " | while IFS=, read -r pid uuid mem name; do"
+    " echo \"$pid,$(ps -o user= -p $pid),$uuid,$mem,$name\"; done"
+)
+_STATUS_COMMAND = f"{_GPU_QUERY} ; echo '---PROCESSES---' ; {_PROCESS_QUERY}"
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, _mtime_ns: int) -> ClusterConfig:
+    """Parse and validate a config file, memoized by path and mtime.
+
+    Keying on st_mtime_ns means an edited file is re-parsed on the next
+    load while repeated constructions (one per CLI invocation, or several
+    monitors in one process) skip the pydantic validation entirely.
+    """
+    data = orjson.loads(Path(config_path).read_bytes())
+    return ClusterConfig(**data)
+
 
 class GPUMonitor:
     """Core GPU monitoring class with caching and concurrent SSH support."""
     
-    def __init__(self, config_path: Optional[str] = None):
-        """Initialize the GPU monitor with configuration."""
+    def __init__(self, config_path: Optional[str] = None, persistent_cache: bool = False):
+        """Initialize the GPU monitor with configuration.
+
+        With persistent_cache=True the status cache is additionally backed
+        by an on-disk store, so short-lived CLI invocations within TTL can
+        skip SSH entirely. Long-lived callers (the MCP server) keep the
+        in-memory cache only.
+        """
         self.config = self._load_config(config_path)
-        self._cache: Dict[str, tuple] = {}  # (data, timestamp)
-        self._semaphore = asyncio.Semaphore(self.config.settings.get("max_concurrent", 4))
+        self._cache = TLRUCache(maxsize=self.config.settings.cache_max_entries,
+                                ttu=self._ttu)
+        self._disk_cache: Optional[Cache] = None
+        if persistent_cache:
+            cache_dir = self.config.settings.cache_dir or str(
+                Path(tempfile.gettempdir()) / "gpu_monitor_cache"
+            )
+            self._disk_cache = Cache(cache_dir)
+        self._last_good: Dict[str, ServerStatus] = {}
+        self._servers_index: Dict[str, ServerConfig] = {}
+        self._servers_index_src: Optional[List[ServerConfig]] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._fanout_semaphore: Optional[asyncio.Semaphore] = None
+        self._ssh_semaphore: Optional[asyncio.Semaphore] = None
+        self._conns: Dict[str, asyncssh.SSHClientConnection] = {}
+        self._conn_locks: Dict[str, asyncio.Lock] = {}
+        self._ctl_dir: Optional[Path] = None
+        self._ssh_base: Optional[List[str]] = None
     
     def _load_config(self, config_path: Optional[str] = None) -> ClusterConfig:
         """Load configuration from JSON file."""
@@ -33,9 +97,7 @@ class GPUMonitor:
             config_path = Path(__file__).parent / "server_config.json"
         
         try:
-            with open(config_path, 'r') as f:
-                data = json.load(f)
-            return ClusterConfig(**data)
+            return _load_config_cached(str(config_path), os.stat(config_path).st_mtime_ns)
         except FileNotFoundError:
             # Create default config if none exists
             default_config = ClusterConfig(
@@ -47,266 +109,661 @@ class GPUMonitor:
                     )
                 ]
             )
-            logger.warning(f"Config file not found at {config_path}, using default config")
+            logger.warning("Config file not found at %s, using default config", config_path)
             return default_config
     
-    def _is_cache_valid(self, key: str, ttl: int) -> bool:
-        """Check if cached data is still valid."""
-        if key not in self._cache:
-            return False
-        _, timestamp = self._cache[key]
-        return time.time() - timestamp < ttl
-    
-    def _get_cached(self, key: str) -> Optional[any]:
-        """Get cached data if valid."""
-        if key in self._cache:
-            data, _ = self._cache[key]
-            return data
+    def _cache_store(self, key: str, status: ServerStatus):
+        """Store a status in the in-memory cache and the disk tier, if any."""
+        self._cache[key] = status
+        if self._disk_cache is not None:
+            # _ttu with now=0 yields the entry's raw lifetime in seconds
+            self._disk_cache.set(key, status, expire=self._ttu(key, status, 0.0))
+
+    def _cache_lookup(self, key: str) -> Optional[ServerStatus]:
+        """Look up a status, falling back to the disk tier on memory miss."""
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if self._disk_cache is not None:
+            status = self._disk_cache.get(key)
+            if status is not None:
+                self._cache[key] = status
+                return status
         return None
-    
-    def _set_cache(self, key: str, data: any):
-        """Set cached data with timestamp."""
-        self._cache[key] = (data, time.time())
-    
-    async def _run_ssh_command(self, hostname: str, command: str) -> tuple[bool, str, float]:
-        """Run SSH command with timeout and measure response time."""
-        start_time = time.time()
-        timeout = self.config.settings.get("ssh_timeout", 5)
-        
+
+    def _cache_evict(self, key: str):
+        """Drop a status from both cache tiers."""
+        self._cache.pop(key, None)
+        if self._disk_cache is not None:
+            self._disk_cache.delete(key)
+
+    @property
+    def _servers_by_id(self) -> Dict[str, ServerConfig]:
+        """Index of servers keyed by id, rebuilt only when config changes."""
+        servers = self.config.servers
+        if self._servers_index_src is not servers:
+            self._servers_index = {s.id: s for s in servers}
+            self._servers_index_src = servers
+        return self._servers_index
+
+    def _ttu(self, _key: str, value: any, now: float) -> float:
+        """Compute per-entry cache expiry: slower servers stay cached longer.
+
+        Freshness is a function of generation cost, bounded by policy
+        min/max, so overloaded SSH targets are not re-polled aggressively
+        while fast servers keep a short TTL.
+        """
+        settings = self.config.settings
+        response_ms = getattr(value, "response_time_ms", None)
+        if response_ms is None:
+            return now + settings.cache_ttl
+        ttl = response_ms / 1000 * 5 + 5
+        return now + max(settings.cache_ttl_min, min(settings.cache_ttl_max, ttl))
+
+    def _conn_lock(self, hostname: str) -> asyncio.Lock:
+        """Get or create the per-host lock guarding connection setup."""
+        lock = self._conn_locks.get(hostname)
+        if lock is None:
+            lock = self._conn_locks[hostname] = asyncio.Lock()
+        return lock
+
+    def _host_semaphore(self, hostname: str) -> asyncio.Semaphore:
+        """Get or create the per-host semaphore bounding concurrent commands.
+
+        Each sshd enforces its own MaxStartups/MaxSessions budget, so the
+        bound is per host rather than a global max_concurrent: probing 50
+        servers in parallel is fine as long as no single host is flooded.
+        """
+        sem = self._host_semaphores.get(hostname)
+        if sem is None:
+            per_host = self.config.settings.max_concurrent_per_host
+            sem = self._host_semaphores[hostname] = asyncio.Semaphore(per_host)
+        return sem
+
+    def _cluster_semaphore(self) -> asyncio.Semaphore:
+        """Get or create the semaphore bounding cluster-wide fan-out.
+
+        Complements the per-host bound: that one protects each sshd,
+        this one caps how many servers are probed at once so a large
+        cluster refresh honors max_concurrent instead of opening one
+        connection per server simultaneously.
+        """
+        if self._fanout_semaphore is None:
+            self._fanout_semaphore = asyncio.Semaphore(self.config.settings.max_concurrent)
+        return self._fanout_semaphore
+
+    def _global_ssh_semaphore(self) -> asyncio.Semaphore:
+        """Get or create the process-wide SSH semaphore.
+
+        A last-resort cap on simultaneous SSH commands across all code
+        paths (status fan-out, kills, ad-hoc calls combined), sized from
+        max_parallel_ssh.
+        """
+        if self._ssh_semaphore is None:
+            self._ssh_semaphore = asyncio.Semaphore(self.config.settings.max_parallel_ssh)
+        return self._ssh_semaphore
+
+    async def _get_server_status_bounded(self, server: ServerConfig, now_ms: int) -> ServerStatus:
+        """Run _get_server_status under the cluster fan-out semaphore."""
+        async with self._cluster_semaphore():
+            return await self._get_server_status(server, now_ms=now_ms)
+
+    async def _get_connection(self, hostname: str, timeout: int) -> asyncssh.SSHClientConnection:
+        """Get a pooled SSH connection for a host, connecting if needed."""
+        async with self._conn_lock(hostname):
+            conn = self._conns.get(hostname)
+            if conn is None:
+                # Company handles authentication; reuse one connection per host
+                conn = await asyncio.wait_for(
+                    asyncssh.connect(hostname, known_hosts=None),
+                    timeout=timeout
+                )
+                self._conns[hostname] = conn
+            return conn
+
+    async def _evict_connection(self, hostname: str):
+        """Drop a broken connection so the next call reconnects."""
+        async with self._conn_lock(hostname):
+            conn = self._conns.pop(hostname, None)
+            if conn is not None:
+                conn.close()
+
+    def _ssh_base_args(self, timeout: int) -> List[str]:
+        """Get system ssh args with ControlMaster multiplexing enabled.
+
+        Built once per monitor (timeout is fixed by settings) and reused
+        for every subprocess invocation; callers unpack but never mutate.
+        """
+        if self._ssh_base is None:
+            self._ctl_dir = Path(tempfile.mkdtemp(prefix="gpumon-ssh-"))
+            atexit.register(shutil.rmtree, self._ctl_dir, True)
+            self._ssh_base = [
+                "ssh",
+                "-o", "ControlMaster=auto",
+                "-o", f"ControlPath={self._ctl_dir}/%r@%h:%p",
+                "-o", "ControlPersist=600",
+                "-o", "BatchMode=yes",
+                "-o", f"ConnectTimeout={timeout}",
+            ]
+        return self._ssh_base
+
+    async def _run_ssh_subprocess(self, hostname: str, command: str) -> tuple[bool, str, float]:
+        """Run SSH command via the system ssh client (fallback path).
+
+        The first call per host opens a persistent master socket; later
+        calls multiplex over it, skipping TCP and key exchange.
+        """
+        start_time = time.perf_counter()
+        timeout = self.config.settings.ssh_timeout
+
         try:
-            # Use subprocess for SSH (company handles authentication)
             process = await asyncio.create_subprocess_exec(
-                "ssh", hostname, command,
+                *self._ssh_base_args(timeout), hostname, command,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
-            
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), 
-                timeout=timeout
-            )
-            
-            response_time = (time.time() - start_time) * 1000
-            
+
+            # Drain stdout line by line as it arrives rather than letting
+            # communicate() accumulate one large buffer per concurrent host
+            async def _drain_stdout():
+                return [line.decode() async for line in process.stdout]
+
+            async def _drain():
+                stdout_lines, stderr = await asyncio.gather(
+                    _drain_stdout(), process.stderr.read()
+                )
+                await process.wait()
+                return stdout_lines, stderr
+
+            stdout_lines, stderr = await asyncio.wait_for(_drain(), timeout=timeout)
+
+            response_time = (time.perf_counter() - start_time) * 1000
+
             if process.returncode == 0:
-                return True, stdout.decode().strip(), response_time
+                return True, ''.join(stdout_lines).strip(), response_time
             else:
                 return False, stderr.decode().strip(), response_time
-                
+
         except asyncio.TimeoutError:
-            return False, f"SSH timeout after {timeout}s", (time.time() - start_time) * 1000
+            return False, f"SSH timeout after {timeout}s", (time.perf_counter() - start_time) * 1000
         except Exception as e:
-            return False, str(e), (time.time() - start_time) * 1000
+            return False, str(e), (time.perf_counter() - start_time) * 1000
+
+    async def _run_ssh_command(self, hostname: str, command: str) -> tuple[bool, str, float]:
+        """Run SSH command with timeout and measure response time.
+
+        Timing uses the monotonic perf counter: immune to clock steps and
+        cheaper than a wall-clock read per command.
+        """
+        start_time = time.perf_counter()
+        timeout = self.config.settings.ssh_timeout
+
+        try:
+            async with self._global_ssh_semaphore(), self._host_semaphore(hostname):
+                for attempt in range(2):
+                    try:
+                        conn = await self._get_connection(hostname, timeout)
+                    except (OSError, asyncssh.Error) as e:
+                        # asyncssh could not establish a connection (e.g. auth
+                        # only available to the system ssh client) - fall back
+                        # to subprocess ssh with ControlMaster multiplexing
+                        logger.warning("asyncssh connection to %s failed (%s), "
+                                       "falling back to system ssh", hostname, e)
+                        return await self._run_ssh_subprocess(hostname, command)
+
+                    try:
+                        result = await asyncio.wait_for(
+                            conn.run(command, check=False),
+                            timeout=timeout
+                        )
+                    except (asyncssh.ConnectionLost, asyncssh.ChannelOpenError):
+                        # Stale pooled connection - evict and retry once
+                        if attempt:
+                            raise
+                        await self._evict_connection(hostname)
+                        continue
+
+                    response_time = (time.perf_counter() - start_time) * 1000
+
+                    if result.exit_status == 0:
+                        return True, (result.stdout or "").strip(), response_time
+                    else:
+                        return False, (result.stderr or result.stdout or "").strip(), response_time
+
+        except asyncio.TimeoutError:
+            return False, f"SSH timeout after {timeout}s", (time.perf_counter() - start_time) * 1000
+        except Exception as e:
+            return False, str(e), (time.perf_counter() - start_time) * 1000
+
+    async def _run_ssh_script(self, hostname: str, commands: List[str]) -> List[tuple[int, str]]:
+        """Run several commands in a single SSH invocation.
+
+        Commands are joined with a sentinel capturing each exit status, so
+        related work pays one channel round-trip instead of one per command.
+        Returns one (exit_status, output) pair per command.
+        """
+        script = f" ; echo {_SCRIPT_SEP}$? ; ".join(commands) + f" ; echo {_SCRIPT_SEP}$?"
+        success, output, _ = await self._run_ssh_command(hostname, script)
+
+        if not success:
+            return [(1, output)] * len(commands)
+
+        results = []
+        chunk_lines: List[str] = []
+        for line in output.split('\n'):
+            if line.startswith(_SCRIPT_SEP):
+                try:
+                    exit_status = int(line[len(_SCRIPT_SEP):])
+                except ValueError:
+                    exit_status = 1
+                results.append((exit_status, '\n'.join(chunk_lines).strip()))
+                chunk_lines = []
+            else:
+                chunk_lines.append(line)
+
+        # A command whose sentinel never arrived (truncated transcript,
+        # restricted shell) has no evidence of success - report failure
+        while len(results) < len(commands):
+            results.append((1, "missing exit status in SSH transcript"))
+        return results[:len(commands)]
+
+    async def aclose(self):
+        """Close all pooled SSH connections."""
+        conns = list(self._conns.values())
+        self._conns.clear()
+        for conn in conns:
+            conn.close()
+        for conn in conns:
+            await conn.wait_closed()
     
-    def _parse_nvidia_smi_output(self, output: str) -> tuple[List[GPUInfo], List[ProcessInfo]]:
-        """Parse nvidia-smi output to extract GPU and process information."""
+    @staticmethod
+    def _int_or_none(value: str) -> Optional[int]:
+        """Parse an optional numeric CSV field ('[N/A]' and blanks -> None)."""
+        try:
+            return int(float(value))
+        except ValueError:
+            return None
+
+    def _parse_nvidia_smi_lines(self, lines) -> tuple[List[GPUInfo], List[ProcessInfo]]:
+        """Parse CSV nvidia-smi status lines in a single pass.
+
+        Accepts any iterable of lines, so callers holding a stream can
+        feed rows as they arrive instead of buffering a full transcript.
+        """
         gpus = []
         processes = []
-        
-        try:
-            # Parse GPU information from nvidia-smi --query-gpu output
-            gpu_lines = []
-            process_lines = []
-            current_section = None
-            
-            for line in output.split('\n'):
-                line = line.strip()
-                if not line:
+        uuid_to_index = {}
+        in_processes = False
+
+        for row in lines:
+            row = row.strip()
+            if row == '---PROCESSES---':
+                in_processes = True
+                continue
+            fields = [f.strip() for f in row.split(',')]
+
+            if not in_processes:
+                # GPU rows: index, uuid, name, util%, mem used, mem total, temp, power
+                if len(fields) < 6:
                     continue
-                
-                # Simple parsing - in real implementation, use nvidia-smi with specific formats
-                if 'GPU' in line and '%' in line:
-                    # Example: GPU 0: Tesla V100, 85% utilization, 15000/16000 MB
-                    match = re.search(r'GPU (\d+).*?(\d+)%.*?(\d+)/(\d+)\s*MB', line)
-                    if match:
-                        gpu_idx, util, used_mem, total_mem = match.groups()
-                        gpu = GPUInfo(
-                            index=int(gpu_idx),
-                            name="Tesla V100",  # Simplified
-                            utilization_percent=int(util),
-                            memory_used_mb=int(used_mem),
-                            memory_total_mb=int(total_mem),
-                            memory_free_mb=int(total_mem) - int(used_mem)
-                        )
-                        gpus.append(gpu)
-                
-                # Parse process information
-                if 'PID' in line and 'Memory' in line:
-                    # Example: PID 12345 user1 GPU:0 2048MB python
-                    match = re.search(r'PID\s+(\d+)\s+(\w+)\s+GPU:(\d+)\s+(\d+)MB\s+(.+)', line)
-                    if match:
-                        pid, user, gpu_idx, mem, proc_name = match.groups()
-                        process = ProcessInfo(
-                            pid=int(pid),
-                            username=user,
-                            gpu_index=int(gpu_idx),
-                            memory_used_mb=int(mem),
-                            process_name=proc_name.strip()
-                        )
-                        processes.append(process)
-        
+                index = int(fields[0])
+                uuid_to_index[fields[1]] = index
+                used_mem = int(fields[4])
+                total_mem = int(fields[5])
+                # Values are already int()-converted above; skip re-validation
+                gpus.append(GPUInfo.model_construct(
+                    index=index,
+                    name=fields[2],
+                    utilization_percent=int(fields[3]),
+                    memory_used_mb=used_mem,
+                    memory_total_mb=total_mem,
+                    memory_free_mb=total_mem - used_mem,
+                    temperature_c=self._int_or_none(fields[6]) if len(fields) > 6 else None,
+                    power_draw_w=self._int_or_none(fields[7]) if len(fields) > 7 else None
+                ))
+            else:
+                # Process rows: pid, username, gpu uuid (or index), mem MB, name
+                if len(fields) < 5:
+                    continue
+                gpu_ref = fields[2]
+                gpu_index = uuid_to_index.get(gpu_ref)
+                if gpu_index is None:
+                    gpu_index = self._int_or_none(gpu_ref) or 0
+                processes.append(ProcessInfo.model_construct(
+                    pid=int(fields[0]),
+                    username=fields[1],
+                    gpu_index=gpu_index,
+                    memory_used_mb=int(fields[3]),
+                    process_name=', '.join(fields[4:])
+                ))
+
+        return gpus, processes
+
+    def _parse_nvidia_smi_output(self, output: str) -> tuple[List[GPUInfo], List[ProcessInfo]]:
+        """Parse CSV nvidia-smi output to extract GPU and process information."""
+        try:
+            gpus, processes = self._parse_nvidia_smi_lines(output.splitlines())
+
+            # Older drivers without --query-compute-apps emit free-form text
+            if not gpus and not processes and output.strip():
+                return self._parse_legacy_output(output)
+            return gpus, processes
         except Exception as e:
-            logger.error(f"Error parsing nvidia-smi output: {e}")
-        
+            logger.exception("Error parsing nvidia-smi output: %s", e)
+            return [], []
+
+    def _parse_legacy_output(self, output: str) -> tuple[List[GPUInfo], List[ProcessInfo]]:
+        """Fallback parser for free-form nvidia-smi output (older drivers)."""
+        gpus = []
+        processes = []
+
+        for line in output.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+
+            if 'GPU' in line and '%' in line:
+                # Example: GPU 0: Tesla V100, 85% utilization, 15000/16000 MB
+                match = _LEGACY_GPU_RE.search(line)
+                if match:
+                    gpu_idx, util, used_mem, total_mem = match.groups()
+                    gpus.append(GPUInfo.model_construct(
+                        index=int(gpu_idx),
+                        name="Tesla V100",  # Simplified
+                        utilization_percent=int(util),
+                        memory_used_mb=int(used_mem),
+                        memory_total_mb=int(total_mem),
+                        memory_free_mb=int(total_mem) - int(used_mem)
+                    ))
+
+            elif 'PID' in line and 'MB' in line:
+                # Example: PID 12345 user1 GPU:0 2048MB python
+                match = _LEGACY_PROC_RE.search(line)
+                if match:
+                    pid, user, gpu_idx, mem, proc_name = match.groups()
+                    processes.append(ProcessInfo.model_construct(
+                        pid=int(pid),
+                        username=user,
+                        gpu_index=int(gpu_idx),
+                        memory_used_mb=int(mem),
+                        process_name=proc_name.strip()
+                    ))
+
         return gpus, processes
     
-    async def _get_server_status(self, server: ServerConfig) -> ServerStatus:
-        """Get status for a single server."""
-        async with self._semaphore:
-            start_time = time.time()
-            
-            # Check cache first
-            cache_key = f"server_status_{server.id}"
-            ttl = self.config.settings.get("cache_ttl", 30)
-            
-            if self._is_cache_valid(cache_key, ttl):
-                cached_data = self._get_cached(cache_key)
-                if cached_data:
-                    return cached_data
-            
-            # Run nvidia-smi command
-            success, output, response_time = await self._run_ssh_command(
-                server.hostname,
-                "nvidia-smi --query-gpu=index,name,utilization.gpu,memory.used,memory.total,temperature.gpu,power.draw --format=csv,noheader,nounits && echo '---PROCESSES---' && nvidia-smi pmon -c 1"
+    async def _get_server_status(self, server: ServerConfig,
+                                 now_ms: Optional[int] = None) -> ServerStatus:
+        """Get status for a single server.
+
+        ``now_ms`` lets get_cluster_status stamp one wall-clock read across
+        a whole refresh instead of one syscall per server.
+        """
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        # Check cache first
+        cache_key = f"server_status_{server.id}"
+        cached = self._cache_lookup(cache_key)
+        if cached is not None:
+            return cached
+
+        # Run nvidia-smi command
+        success, output, response_time = await self._run_ssh_command(
+            server.hostname, _STATUS_COMMAND
+        )
+
+        if success:
+            gpus, processes = self._parse_nvidia_smi_output(output)
+            status = ServerStatus(
+                server_id=server.id,
+                hostname=server.hostname,
+                online=True,
+                gpus=gpus,
+                processes=processes,
+                last_updated_ms=now_ms,
+                response_time_ms=response_time
             )
-            
-            if success:
-                gpus, processes = self._parse_nvidia_smi_output(output)
-                status = ServerStatus(
-                    server_id=server.id,
-                    hostname=server.hostname,
-                    online=True,
-                    gpus=gpus,
-                    processes=processes,
-                    last_updated=datetime.now(),
-                    response_time_ms=response_time
-                )
-            else:
-                status = ServerStatus(
-                    server_id=server.id,
-                    hostname=server.hostname,
-                    online=False,
-                    error_message=output,
-                    last_updated=datetime.now(),
-                    response_time_ms=response_time
-                )
-            
-            # Cache the result
-            self._set_cache(cache_key, status)
-            return status
-    
+            self._last_good[server.id] = status
+        else:
+            # Serve last-known data during transient SSH outages
+            # instead of flapping to an empty offline status
+            last_good = self._last_good.get(server.id)
+            grace = self.config.settings.stale_grace_seconds
+            if last_good is not None and now_ms - last_good.last_updated_ms < grace * 1000:
+                stale_status = last_good.model_copy(update={
+                    "stale": True,
+                    "error_message": output,
+                    "response_time_ms": response_time
+                })
+                # model_copy carries private attrs over, so drop the
+                # parent's memoized JSON: to_json() on the copy must
+                # reflect the stale/error fields, not the pre-outage dump
+                stale_status._cached_json = None
+                return stale_status
+
+            status = ServerStatus(
+                server_id=server.id,
+                hostname=server.hostname,
+                online=False,
+                error_message=output,
+                last_updated_ms=now_ms,
+                response_time_ms=response_time
+            )
+
+        # Cache the result
+        self._cache_store(cache_key, status)
+        return status
+
     async def get_cluster_status(self, server_ids: Optional[List[str]] = None) -> ClusterStatus:
-        """Get status for all servers or specific servers."""
+        """Get status for all servers or specific servers.
+
+        Results stream in as servers reply: once the fastest server has
+        responded, stragglers get twice that time before being reported
+        offline, so one hung host cannot block the whole response.
+        """
         servers_to_check = self.config.servers
         if server_ids:
-            servers_to_check = [s for s in servers_to_check if s.id in server_ids]
-        
-        # Get status for all servers concurrently
-        tasks = [self._get_server_status(server) for server in servers_to_check]
-        server_statuses = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter out exceptions and create valid statuses
-        valid_statuses = []
-        for i, status in enumerate(server_statuses):
-            if isinstance(status, Exception):
-                logger.error(f"Error getting status for {servers_to_check[i].id}: {status}")
-                # Create error status
-                error_status = ServerStatus(
-                    server_id=servers_to_check[i].id,
-                    hostname=servers_to_check[i].hostname,
-                    online=False,
-                    error_message=str(status),
-                    last_updated=datetime.now()
-                )
-                valid_statuses.append(error_status)
+            by_id = self._servers_by_id
+            servers_to_check = [by_id[i] for i in server_ids if i in by_id]
+
+        # Query all servers concurrently with a dynamic deadline,
+        # stamping one wall-clock read across the whole refresh.
+        # Cache hits are resolved up front so the deadline is derived only
+        # from servers that actually perform SSH: a microsecond cache hit
+        # must not shrink the time budget for healthy slower servers.
+        now_ms = int(time.time() * 1000)
+        start = time.monotonic()
+        entries = []
+        pending = set()
+        for server in servers_to_check:
+            cached = self._cache_lookup(f"server_status_{server.id}")
+            if cached is not None:
+                entries.append((server, cached))
             else:
-                valid_statuses.append(status)
-        
-        # Calculate cluster summary
-        total_gpus = sum(len(s.gpus) for s in valid_statuses if s.online)
-        online_servers = sum(1 for s in valid_statuses if s.online)
-        
+                task = asyncio.create_task(self._get_server_status_bounded(server, now_ms))
+                entries.append((server, task))
+                pending.add(task)
+        deadline = 0.0
+
+        if pending:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if pending:
+            deadline = max(2 * (time.monotonic() - start), 0.5)
+            _, pending = await asyncio.wait(pending, timeout=deadline)
+
+        # Collect results, treating stragglers and exceptions as offline;
+        # cluster aggregates accumulate in the same pass instead of
+        # re-summing over the list afterwards
+        valid_statuses = []
+        total_gpus = online_servers = 0
+        for server, entry in entries:
+            if not isinstance(entry, ServerStatus):
+                if entry in pending:
+                    entry.cancel()
+                    logger.warning("Server %s missed the cluster deadline (%.1fs)", server.id, deadline)
+                    valid_statuses.append(ServerStatus(
+                        server_id=server.id,
+                        hostname=server.hostname,
+                        online=False,
+                        error_message=f"No response within cluster deadline ({deadline:.1f}s)",
+                        last_updated_ms=now_ms
+                    ))
+                    continue
+
+                exception = entry.exception()
+                if exception is not None:
+                    logger.error("Error getting status for %s: %s", server.id, exception)
+                    valid_statuses.append(ServerStatus(
+                        server_id=server.id,
+                        hostname=server.hostname,
+                        online=False,
+                        error_message=str(exception),
+                        last_updated_ms=now_ms
+                    ))
+                    continue
+                entry = entry.result()
+
+            if entry.online:
+                online_servers += 1
+                total_gpus += len(entry.gpus)
+            valid_statuses.append(entry)
+
         return ClusterStatus(
             servers=valid_statuses,
             total_gpus=total_gpus,
             online_servers=online_servers,
             total_servers=len(valid_statuses),
-            last_updated=datetime.now()
+            last_updated_ms=now_ms
         )
     
+    async def iter_cluster_status(self, server_ids: Optional[List[str]] = None):
+        """Yield per-server statuses as each server responds.
+
+        Unlike get_cluster_status this imposes no cluster deadline and
+        computes no summary; callers that can consume results
+        incrementally see the fastest server's status immediately
+        instead of waiting for the slowest.
+        """
+        servers_to_check = self.config.servers
+        if server_ids:
+            by_id = self._servers_by_id
+            servers_to_check = [by_id[i] for i in server_ids if i in by_id]
+
+        now_ms = int(time.time() * 1000)
+        tasks = [
+            asyncio.create_task(self._get_server_status_bounded(server, now_ms))
+            for server in servers_to_check
+        ]
+        for completed in asyncio.as_completed(tasks):
+            yield await completed
+
     async def get_user_usage(self, username: str, server_ids: Optional[List[str]] = None) -> UserUsageSummary:
         """Get GPU usage summary for a specific user."""
         cluster_status = await self.get_cluster_status(server_ids)
-        
-        user_processes = []
-        processes_by_server = {}
-        servers_used = []
-        
-        for server_status in cluster_status.servers:
-            if not server_status.online:
+
+        # Accumulate the summary fields alongside the per-server filter so
+        # each process list is walked once, with no flattened intermediate
+        processes_by_server: Dict[str, List[ProcessInfo]] = {}
+        total_processes = 0
+        total_memory_used_mb = 0
+        for s in cluster_status.servers:
+            if not s.online:
                 continue
-                
-            server_processes = [
-                p for p in server_status.processes 
-                if p.username == username
-            ]
-            
-            if server_processes:
-                servers_used.append(server_status.server_id)
-                processes_by_server[server_status.server_id] = server_processes
-                user_processes.extend(server_processes)
-        
-        total_memory = sum(p.memory_used_mb for p in user_processes)
-        
+            matched = [p for p in s.processes if p.username == username]
+            if matched:
+                processes_by_server[s.server_id] = matched
+                total_processes += len(matched)
+                total_memory_used_mb += sum(p.memory_used_mb for p in matched)
+
         return UserUsageSummary(
             username=username,
-            total_processes=len(user_processes),
-            total_memory_used_mb=total_memory,
-            servers_used=servers_used,
+            total_processes=total_processes,
+            total_memory_used_mb=total_memory_used_mb,
+            servers_used=list(processes_by_server),
             processes_by_server=processes_by_server,
-            last_updated=datetime.now()
+            last_updated_ms=int(time.time() * 1000)
         )
     
     async def kill_user_tasks(
-        self, 
-        username: str, 
+        self,
+        username: str,
         server_ids: Optional[List[str]] = None,
-        confirm: bool = False
+        confirm: bool = False,
+        *,
+        usage: Optional[UserUsageSummary] = None
     ) -> Dict[str, Union[bool, str]]:
-        """Kill all tasks for a user on specified servers."""
+        """Kill all tasks for a user on specified servers.
+
+        Callers that already fetched the user's usage (e.g. for a confirm
+        prompt) can pass it as ``usage`` to skip a second cluster sweep.
+        """
         if not confirm:
             return {"error": "Must set confirm=True to kill user tasks"}
-        
-        # Get current user processes
-        usage = await self.get_user_usage(username, server_ids)
+
+        # Get current user processes unless the caller supplied them
+        if usage is None:
+            usage = await self.get_user_usage(username, server_ids)
         
         if not usage.processes_by_server:
             return {"message": f"No processes found for user {username}"}
         
+        # Dispatch all per-server kills concurrently, the same pattern
+        # get_cluster_status uses: wall time is the slowest server, not
+        # the sum of every SSH round-trip
+        by_id = self._servers_by_id
+        targets = [
+            (server_id, by_id.get(server_id), processes)
+            for server_id, processes in usage.processes_by_server.items()
+        ]
+        outcomes = await asyncio.gather(
+            *(self._kill_on_server(server, processes)
+              for _, server, processes in targets if server),
+            return_exceptions=True
+        )
+
         results = {}
-        
-        for server_id, processes in usage.processes_by_server.items():
-            server = next((s for s in self.config.servers if s.id == server_id), None)
+        outcome_iter = iter(outcomes)
+        for server_id, server, _ in targets:
             if not server:
-                results[server_id] = f"Server config not found"
+                results[server_id] = "Server config not found"
                 continue
-            
-            pids = [str(p.pid) for p in processes]
-            kill_command = f"kill -9 {' '.join(pids)}"
-            
-            success, output, _ = await self._run_ssh_command(server.hostname, kill_command)
-            
-            if success:
-                results[server_id] = f"Killed {len(pids)} processes"
-                # Invalidate cache for this server
-                cache_key = f"server_status_{server_id}"
-                if cache_key in self._cache:
-                    del self._cache[cache_key]
-            else:
-                results[server_id] = f"Failed to kill processes: {output}"
-        
+            outcome = next(outcome_iter)
+            results[server_id] = str(outcome) if isinstance(outcome, Exception) else outcome
+
         return results
 
+    async def _kill_on_server(self, server: ServerConfig, processes: List[ProcessInfo]) -> str:
+        """Kill the given processes on one server and refresh its cache entry."""
+        pids = [str(p.pid) for p in processes]
+        kill_command = f"kill -9 {' '.join(pids)}"
+
+        # Batch the kill with a status refresh so the cache update
+        # happens in-band instead of costing a second round-trip
+        outcomes = await self._run_ssh_script(
+            server.hostname, [kill_command, _STATUS_COMMAND]
+        )
+        kill_status, kill_output = outcomes[0]
+        refresh_status, refresh_output = outcomes[1]
+
+        if kill_status != 0:
+            return f"Failed to kill processes: {kill_output}"
+
+        cache_key = f"server_status_{server.id}"
+        if refresh_status == 0 and refresh_output:
+            gpus, procs = self._parse_nvidia_smi_output(refresh_output)
+            self._cache_store(cache_key, ServerStatus(
+                server_id=server.id,
+                hostname=server.hostname,
+                online=True,
+                gpus=gpus,
+                processes=procs,
+                last_updated_ms=int(time.time() * 1000)
+            ))
+        else:
+            self._cache_evict(cache_key)
+        return f"Killed {len(pids)} processes"
+
 
 # Convenience functions for CLI usage
 async def check_gpu_status(server_id: str = "all", config_path: Optional[str] = None) -> ClusterStatus:
@@ -1,8 +1,7 @@
 """Data models for GPU cluster monitoring."""
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
-from datetime import datetime
+from typing import List, Optional, Dict
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 
 class ServerConfig(BaseModel):
@@ -12,48 +11,92 @@ class ServerConfig(BaseModel):
     description: str = ""
 
 
+class SettingsConfig(BaseModel):
+    """Tunable cluster settings, validated once at config load time.
+
+    Typed attribute access replaces per-call dict lookups with defaults
+    scattered across the hot paths.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    cache_ttl: int = 30
+    cache_ttl_min: int = 10
+    cache_ttl_max: int = 120
+    cache_max_entries: int = 128
+    usage_cache_ttl: int = 10
+    ssh_timeout: int = 5
+    max_concurrent: int = 4
+    max_concurrent_per_host: int = 1
+    max_parallel_ssh: int = 16
+    stale_grace_seconds: int = 300
+    cache_dir: Optional[str] = None
+
+
 class ClusterConfig(BaseModel):
     """Configuration for the entire cluster."""
     servers: List[ServerConfig]
-    settings: Dict[str, Any] = {
-        "cache_ttl": 30,
-        "ssh_timeout": 5,
-        "max_concurrent": 4
-    }
+    settings: SettingsConfig = SettingsConfig()
 
 
 class GPUInfo(BaseModel):
-    """Information about a single GPU."""
-    index: int
+    """Information about a single GPU.
+
+    Instantiated once per GPU per refresh; frozen so parsed records are
+    immutable and hashable, never mutated after parse.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    index: int = Field(ge=0)
     name: str
-    utilization_percent: int
-    memory_used_mb: int
-    memory_total_mb: int
-    memory_free_mb: int
+    utilization_percent: int = Field(ge=0, le=100)
+    memory_used_mb: int = Field(ge=0)
+    memory_total_mb: int = Field(ge=0)
+    memory_free_mb: int = Field(ge=0)
     temperature_c: Optional[int] = None
     power_draw_w: Optional[int] = None
 
 
 class ProcessInfo(BaseModel):
-    """Information about a GPU process."""
-    pid: int
+    """Information about a GPU process.
+
+    The hottest record type (many per GPU); frozen for the same reason
+    as GPUInfo.
+    """
+    model_config = ConfigDict(frozen=True)
+
+    pid: int = Field(ge=1)
     username: str
-    gpu_index: int
-    memory_used_mb: int
+    gpu_index: int = Field(ge=0)
+    memory_used_mb: int = Field(ge=0)
     process_name: str
 
 
 class ServerStatus(BaseModel):
-    """Status of a single server."""
+    """Status of a single server.
+
+    Frozen like the records it contains; derived variants (e.g. the
+    stale fallback) go through model_copy(update=...).
+    """
+    model_config = ConfigDict(frozen=True)
+
     server_id: str
     hostname: str
     online: bool
+    stale: bool = False
     error_message: Optional[str] = None
     gpus: List[GPUInfo] = []
     processes: List[ProcessInfo] = []
-    last_updated: datetime
+    last_updated_ms: int  # Unix epoch milliseconds
     response_time_ms: Optional[float] = None
 
+    _cached_json: Optional[str] = PrivateAttr(default=None)
+
+    def to_json(self) -> str:
+        """Serialize once and reuse; safe because instances are frozen."""
+        if self._cached_json is None:
+            self._cached_json = self.model_dump_json()
+        return self._cached_json
+
 
 class UserUsageSummary(BaseModel):
     """Summary of user's GPU usage across servers."""
@@ -62,7 +105,7 @@ class UserUsageSummary(BaseModel):
     total_memory_used_mb: int
     servers_used: List[str]
     processes_by_server: Dict[str, List[ProcessInfo]]
-    last_updated: datetime
+    last_updated_ms: int  # Unix epoch milliseconds
 
 
 class ClusterStatus(BaseModel):
@@ -71,4 +114,4 @@ class ClusterStatus(BaseModel):
     total_gpus: int
     online_servers: int
     total_servers: int
-    last_updated: datetime
+    last_updated_ms: int  # Unix epoch milliseconds
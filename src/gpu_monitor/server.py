@@ -1,21 +1,43 @@
 """MCP server implementation for GPU cluster monitoring via HTTP."""
 
 import asyncio
-import json
+import functools
+import logging
 import os
-from typing import Optional, Dict, Any
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional
 
+import orjson
 from fastmcp import FastMCP
 from .core import GPUMonitor
 from .models import ClusterStatus, UserUsageSummary
 
-# Initialize FastMCP app for HTTP transport
-app = FastMCP("GPU Monitor")
+logger = logging.getLogger(__name__)
 
 # Global monitor instance
 monitor: Optional[GPUMonitor] = None
 
 
+@asynccontextmanager
+async def _lifespan(_app):
+    """Close the monitor's pooled SSH connections on server shutdown.
+
+    Runs inside the server's event loop, where the pooled asyncssh
+    transports live; closing them from a fresh loop after run() returns
+    would fail with 'Event loop is closed'.
+    """
+    try:
+        yield
+    finally:
+        if monitor is not None:
+            await monitor.aclose()
+
+
+# Initialize FastMCP app for HTTP transport
+app = FastMCP("GPU Monitor", lifespan=_lifespan)
+
+
 def get_monitor() -> GPUMonitor:
     """Get or create the global monitor instance."""
     global monitor
@@ -24,30 +46,131 @@ def get_monitor() -> GPUMonitor:
     return monitor
 
 
+@functools.cache
 def get_current_user() -> str:
-    """Get current user from environment."""
+    """Get current user from environment (cached; $USER is stable per process)."""
     return os.environ.get('USER', 'unknown')
 
 
+class _StatusCache:
+    """Short-TTL response cache with stale-while-revalidate.
+
+    Fresh hits return immediately; stale hits return the old value and
+    kick off one background refresh, so MCP clients never block on the
+    SSH fan-out once a first result exists.
+    """
+
+    # Entry cap: usage keys are per-username, so ad-hoc queries against a
+    # long-running server would otherwise grow the dict without bound
+    _MAX_ENTRIES = 256
+
+    def __init__(self) -> None:
+        self._entries: Dict[tuple, tuple[float, Any]] = {}
+        self._refreshing: set = set()
+        # Strong references to in-flight refreshes; the event loop only
+        # holds tasks weakly, so an unreferenced task can be collected
+        # mid-refresh
+        self._tasks: set = set()
+
+    def _store(self, key: tuple, value: Any, ttl: float):
+        if key not in self._entries and len(self._entries) >= self._MAX_ENTRIES:
+            oldest = min(self._entries, key=lambda k: self._entries[k][0])
+            del self._entries[oldest]
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    async def _refresh(self, key: tuple, fetch: Callable[[], Awaitable[Any]], ttl: float):
+        try:
+            value = await fetch()
+        except Exception:
+            # Keep serving the stale entry; the next stale hit retries
+            logger.exception("Background refresh failed for %r", key)
+        else:
+            self._store(key, value, ttl)
+        finally:
+            self._refreshing.discard(key)
+
+    async def get(self, key: tuple, fetch: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expiry, value = entry
+            if time.monotonic() < expiry:
+                return value
+            if key not in self._refreshing:
+                self._refreshing.add(key)
+                task = asyncio.create_task(self._refresh(key, fetch, ttl))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            return value
+
+        value = await fetch()
+        self._store(key, value, ttl)
+        return value
+
+
+_status_cache = _StatusCache()
+
+# Pre-serialized error payload; the handler substitutes one escaped string
+_SERVER_NOT_FOUND = '{"error": %s}'
+
+
+async def get_cluster_status_cached(server_ids=None) -> ClusterStatus:
+    """Get cluster status through the stale-while-revalidate cache."""
+    monitor = get_monitor()
+    ttl = monitor.config.settings.cache_ttl
+    key = ("status", tuple(sorted(server_ids or [])))
+    return await _status_cache.get(key, lambda: monitor.get_cluster_status(server_ids), ttl)
+
+
+async def get_user_usage_cached(username: str, server_ids=None) -> UserUsageSummary:
+    """Get a user's usage summary through the stale-while-revalidate cache.
+
+    Usage answers feed kill decisions, so they run on their own shorter
+    TTL tier than whole-cluster status.
+    """
+    monitor = get_monitor()
+    ttl = monitor.config.settings.usage_cache_ttl
+    key = ("usage", username, tuple(sorted(server_ids or [])))
+    return await _status_cache.get(key, lambda: monitor.get_user_usage(username, server_ids), ttl)
+
+
 @app.resource("gpu://status")
 async def gpu_status_resource():
     """Resource: Get status of all GPU servers."""
-    monitor = get_monitor()
-    status = await monitor.get_cluster_status()
+    status = await get_cluster_status_cached()
     return {
         "uri": "gpu://status",
         "name": "GPU Cluster Status",
         "description": "Current status of all GPU servers in the cluster",
         "mimeType": "application/json",
-        "text": status.model_dump_json(indent=2)
+        "text": status.model_dump_json()
+    }
+
+
+@app.resource("gpu://status/stream")
+async def gpu_status_stream_resource():
+    """Resource: Per-server status, assembled as each server responds.
+
+    Serializes every ServerStatus the moment its SSH call completes, so
+    the payload is built incrementally in completion order instead of
+    waiting on the slowest server before encoding anything.
+    """
+    monitor = get_monitor()
+    chunks = []
+    async for server_status in monitor.iter_cluster_status():
+        chunks.append(server_status.to_json())
+    return {
+        "uri": "gpu://status/stream",
+        "name": "GPU Cluster Status (streamed)",
+        "description": "Per-server status in completion order",
+        "mimeType": "application/json",
+        "text": "[" + ",".join(chunks) + "]"
     }
 
 
 @app.resource("gpu://status/{server_id}")
 async def gpu_server_status_resource(server_id: str):
     """Resource: Get status of a specific GPU server."""
-    monitor = get_monitor()
-    status = await monitor.get_cluster_status([server_id])
+    status = await get_cluster_status_cached([server_id])
     server_status = status.servers[0] if status.servers else None
     
     if not server_status:
@@ -56,7 +179,7 @@ async def gpu_server_status_resource(server_id: str):
             "name": f"GPU Server {server_id} Status",
             "description": f"Server {server_id} not found",
             "mimeType": "application/json",
-            "text": json.dumps({"error": f"Server {server_id} not found"}, indent=2)
+            "text": _SERVER_NOT_FOUND % orjson.dumps(f"Server {server_id} not found").decode()
         }
     
     return {
@@ -64,35 +187,33 @@ async def gpu_server_status_resource(server_id: str):
         "name": f"GPU Server {server_id} Status", 
         "description": f"Current status of GPU server {server_id}",
         "mimeType": "application/json",
-        "text": server_status.model_dump_json(indent=2)
+        "text": server_status.to_json()
     }
 
 
 @app.resource("gpu://usage/{username}")
 async def gpu_user_usage_resource(username: str):
     """Resource: Get GPU usage for a specific user across all servers."""
-    monitor = get_monitor()
-    usage = await monitor.get_user_usage(username)
+    usage = await get_user_usage_cached(username)
     return {
         "uri": f"gpu://usage/{username}",
         "name": f"GPU Usage for {username}",
         "description": f"GPU usage summary for user {username} across all servers",
         "mimeType": "application/json", 
-        "text": usage.model_dump_json(indent=2)
+        "text": usage.model_dump_json()
     }
 
 
 @app.resource("gpu://usage/{username}/{server_id}")
 async def gpu_user_server_usage_resource(username: str, server_id: str):
     """Resource: Get GPU usage for a specific user on a specific server."""
-    monitor = get_monitor()
-    usage = await monitor.get_user_usage(username, [server_id])
+    usage = await get_user_usage_cached(username, [server_id])
     return {
         "uri": f"gpu://usage/{username}/{server_id}",
         "name": f"GPU Usage for {username} on {server_id}",
         "description": f"GPU usage for user {username} on server {server_id}",
         "mimeType": "application/json",
-        "text": usage.model_dump_json(indent=2)
+        "text": usage.model_dump_json()
     }
 
 
@@ -107,10 +228,12 @@ async def check_gpu_status_tool(server_id: Optional[str] = None):
     Returns:
         JSON with GPU status information including utilization, memory usage, and running processes.
     """
-    monitor = get_monitor()
     server_ids = [server_id] if server_id else None
-    status = await monitor.get_cluster_status(server_ids)
-    return status.model_dump()
+    status = await get_cluster_status_cached(server_ids)
+    # Serialize via pydantic-core's Rust path instead of model_dump(),
+    # which hands the framework a dict full of datetime objects to
+    # re-encode through Python-level json
+    return orjson.loads(status.model_dump_json())
 
 
 @app.tool("check_user_usage")
@@ -125,11 +248,10 @@ async def check_user_usage_tool(username: Optional[str] = None, server_id: Optio
     Returns:
         JSON with user's GPU usage summary including processes and memory consumption.
     """
-    monitor = get_monitor()
     username = get_current_user() if username is None else username
     server_ids = [server_id] if server_id else None
-    usage = await monitor.get_user_usage(username, server_ids)
-    return usage.model_dump()
+    usage = await get_user_usage_cached(username, server_ids)
+    return orjson.loads(usage.model_dump_json())
 
 
 @app.tool("kill_user_tasks")
@@ -152,6 +274,39 @@ async def kill_user_tasks_tool(username: Optional[str] = None, server_id: Option
     return results
 
 
+# Constant prompt-template fragments, hoisted so each prompt call
+# concatenates references instead of re-allocating the full text
+_SUMMARY_HEADER = "You are a helpful assistant analyzing GPU cluster availability.\n\n"
+_SUMMARY_NO_DATA = (
+    "If servers data is not provided, ask the user whether to use the resource `gpu://status`. If so, use the resource. "
+    "Otherwise, ask the user to provide GPU status details."
+)
+_SUMMARY_TAIL = (
+    "\n\nProvide a concise summary highlighting:\n"
+    "1. Which server is most available (lowest utilization, most free memory)\n"
+    "2. Overall cluster utilization\n"
+    "3. Any servers that are offline or have issues\n"
+    "4. Recommendation for job placement\n\n"
+    "Format your response to be actionable for someone looking to start a new GPU job.\n"
+    "Use emojis like \U0001F7E2 for available, \U0001F7E1 for moderate usage, \U0001F534 for busy/unavailable."
+)
+_ANALYZE_TAIL = (
+    "\n\nProvide an analysis including:\n"
+    "1. Total resource consumption (processes, memory)\n"
+    "2. Which servers they're using\n"
+    "3. Whether their usage seems efficient\n"
+    "4. Any recommendations for optimization\n\n"
+    "Be constructive and helpful in your analysis."
+)
+_KILL_TAIL = (
+    "This action is IRREVERSIBLE and will:\n"
+    "- Terminate all running training/inference jobs\n"
+    "- Potentially lose unsaved work\n"
+    "- Free up GPU resources immediately\n\n"
+    "Type 'YES' to confirm, or 'NO' to cancel."
+)
+
+
 @app.prompt("summarize_gpu_availability")
 def summarize_gpu_availability(servers: Optional[Dict[str, Any]] = None) -> str:
     """
@@ -163,25 +318,13 @@ def summarize_gpu_availability(servers: Optional[Dict[str, Any]] = None) -> str:
     Returns:
         A human-friendly summary of GPU availability and recommendations
     """
-    header = "You are a helpful assistant analyzing GPU cluster availability.\n\n"
-    
     if servers is None:
-        body = (
-            "If servers data is not provided, ask the user whether to use the resource `gpu://status`. If so, use the resource. "
-            "Otherwise, ask the user to provide GPU status details."
-        )
+        body = _SUMMARY_NO_DATA
     else:
-        body = f"Here is the current GPU server status:\n\n{json.dumps(servers, indent=2)}"
+        body = ("Here is the current GPU server status:\n\n"
+                + orjson.dumps(servers, option=orjson.OPT_INDENT_2).decode())
     
-    return header + body + (
-        "\n\nProvide a concise summary highlighting:\n"
-        "1. Which server is most available (lowest utilization, most free memory)\n"
-        "2. Overall cluster utilization\n"
-        "3. Any servers that are offline or have issues\n"
-        "4. Recommendation for job placement\n\n"
-        "Format your response to be actionable for someone looking to start a new GPU job.\n"
-        "Use emojis like 🟢 for available, 🟡 for moderate usage, 🔴 for busy/unavailable."
-    )
+    return _SUMMARY_HEADER + body + _SUMMARY_TAIL
 
 
 @app.prompt("analyze_user_usage") 
@@ -196,8 +339,6 @@ def analyze_user_usage(username: Optional[str] = None, usage: Optional[Dict[str,
     Returns:
         Analysis and recommendations for the user's GPU usage
     """
-    import os
-    
     # Auto-detect username if not provided
     if username is None:
         username = os.getenv('USER', 'current user')
@@ -210,16 +351,10 @@ def analyze_user_usage(username: Optional[str] = None, usage: Optional[Dict[str,
             "Otherwise, ask the user to provide usage details."
         )
     else:
-        body = f"Here is their current GPU usage:\n\n{json.dumps(usage, indent=2)}"
+        body = ("Here is their current GPU usage:\n\n"
+                + orjson.dumps(usage, option=orjson.OPT_INDENT_2).decode())
     
-    return header + body + (
-        "\n\nProvide an analysis including:\n"
-        "1. Total resource consumption (processes, memory)\n"
-        "2. Which servers they're using\n"
-        "3. Whether their usage seems efficient\n"
-        "4. Any recommendations for optimization\n\n"
-        "Be constructive and helpful in your analysis."
-    )
+    return header + body + _ANALYZE_TAIL
 
 
 @app.prompt("format_kill_confirmation")
@@ -235,8 +370,6 @@ def format_kill_confirmation(username: Optional[str] = None, server_id: Optional
     Returns:
         Formatted confirmation message for process termination
     """
-    import os
-    
     # Auto-detect username if not provided
     if username is None:
         username = os.getenv('USER', 'current user')
@@ -251,13 +384,9 @@ def format_kill_confirmation(username: Optional[str] = None, server_id: Optional
         process_text = f"{process_count} GPU processes"
     
     return (
-        f"⚠️  **CONFIRM PROCESS TERMINATION** ⚠️\n\n"
+        f"\u26A0\uFE0F  **CONFIRM PROCESS TERMINATION** \u26A0\uFE0F\n\n"
         f"You are about to kill {process_text} for user {username} on {server_id}.\n\n"
-        "This action is IRREVERSIBLE and will:\n"
-        "- Terminate all running training/inference jobs\n"
-        "- Potentially lose unsaved work\n"
-        "- Free up GPU resources immediately\n\n"
-        "Type 'YES' to confirm, or 'NO' to cancel."
+        + _KILL_TAIL
     )
 
 
@@ -280,7 +409,7 @@ def main():
     print(f"📋 Monitoring {len(monitor.config.servers)} servers")
     print(f"🔗 VSCode config: {{\"servers\": {{\"gpu-mcp\": {{\"type\": \"http\", \"url\": \"http://{args.host}:{args.port}\"}}}}}}")
     
-    # Run the HTTP MCP server
+    # Run the HTTP MCP server; the lifespan hook closes the SSH pool
     app.run(host=args.host, port=args.port)
 
 
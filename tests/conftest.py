@@ -32,24 +32,36 @@ def sample_config():
     )
 
 
+@pytest.fixture(scope="session")
+def shared_monitor():
+    """One GPUMonitor shared across CLI tests.
+
+    Built without __init__ so no config file is read; tests assign
+    AsyncMock methods for the calls they exercise, amortizing monitor
+    setup across the whole session.
+    """
+    from gpu_monitor.core import GPUMonitor
+    return GPUMonitor.__new__(GPUMonitor)
+
+
 @pytest.fixture
 def config_file(sample_config):
     """Temporary config file for testing."""
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-        f.write(sample_config.model_dump_json(indent=2))
+    with tempfile.NamedTemporaryFile(mode='wb', suffix='.json', delete=False) as f:
+        f.write(sample_config.model_dump_json().encode())
         return f.name
 
 
 @pytest.fixture
 def mock_nvidia_smi_output():
-    """Mock nvidia-smi output for testing."""
+    """Mock CSV nvidia-smi output for testing."""
     return """
-GPU 0: Tesla V100, 85% utilization, 15000/16000 MB
-GPU 1: Tesla V100, 45% utilization, 8000/16000 MB
+0, GPU-aaaa1111, Tesla V100, 85, 15000, 16000, 75, 250
+1, GPU-bbbb2222, Tesla V100, 45, 8000, 16000, 62, 180
 ---PROCESSES---
-PID 12345 testuser GPU:0 2048MB python train.py
-PID 67890 testuser GPU:1 4096MB python inference.py
-PID 11111 otheruser GPU:0 1024MB jupyter
+12345, testuser, GPU-aaaa1111, 2048, python train.py
+67890, testuser, GPU-bbbb2222, 4096, python inference.py
+11111, otheruser, GPU-aaaa1111, 1024, jupyter
 """
 
 
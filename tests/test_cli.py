@@ -4,10 +4,13 @@ import pytest
 import json
 from unittest.mock import patch, AsyncMock, MagicMock
 from click.testing import CliRunner
-from datetime import datetime
 
 from gpu_monitor.cli import cli
-from gpu_monitor.models import ClusterStatus, ServerStatus, UserUsageSummary
+from gpu_monitor.models import ClusterStatus, ProcessInfo, ServerStatus, UserUsageSummary
+
+# One deterministic timestamp for every mock model: no per-test clock
+# reads, and snapshot output can be compared as plain strings
+_NOW_MS = 1704110400000  # 2024-01-01 12:00:00 UTC
 
 
 class TestCLI:
@@ -16,6 +19,11 @@ class TestCLI:
     def setup_method(self):
         """Set up test fixtures."""
         self.runner = CliRunner()
+
+    def invoke(self, monitor, args, **kwargs):
+        """Invoke the CLI with GPUMonitor patched to the shared monitor."""
+        with patch('gpu_monitor.cli.GPUMonitor', return_value=monitor):
+            return self.runner.invoke(cli, args, **kwargs)
     
     def test_cli_config_command(self, config_file):
         """Test config command."""
@@ -43,10 +51,8 @@ class TestCLI:
             assert result.exit_code == 0
             assert "Error loading configuration" in result.output
     
-    @patch('gpu_monitor.cli.asyncio.run')
-    def test_cli_status_command(self, mock_asyncio_run):
+    def test_cli_status_command(self, shared_monitor):
         """Test status command."""
-        # Mock the async function result
         mock_cluster_status = ClusterStatus(
             servers=[
                 ServerStatus(
@@ -55,43 +61,35 @@ class TestCLI:
                     online=True,
                     gpus=[],
                     processes=[],
-                    last_updated=datetime.now(),
+                    last_updated_ms=_NOW_MS,
                     response_time_ms=100.0
                 )
             ],
             total_gpus=0,
             online_servers=1,
             total_servers=1,
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_cluster_status = AsyncMock(return_value=mock_cluster_status)
         
-        async def mock_status_func():
-            return mock_cluster_status
-            
-        mock_asyncio_run.side_effect = lambda func: mock_status_func()
-        
-        result = self.runner.invoke(cli, ['status'])
+        result = self.invoke(shared_monitor, ['status'])
         
         assert result.exit_code == 0
-        mock_asyncio_run.assert_called_once()
+        assert "gpu01" in result.output
+        shared_monitor.get_cluster_status.assert_awaited_once()
     
-    @patch('gpu_monitor.cli.asyncio.run')
-    def test_cli_status_json_output(self, mock_asyncio_run):
+    def test_cli_status_json_output(self, shared_monitor):
         """Test status command with JSON output."""
         mock_cluster_status = ClusterStatus(
             servers=[],
             total_gpus=0,
             online_servers=0,
             total_servers=0,
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_cluster_status = AsyncMock(return_value=mock_cluster_status)
         
-        async def mock_status_func():
-            return mock_cluster_status
-            
-        mock_asyncio_run.side_effect = lambda func: mock_status_func()
-        
-        result = self.runner.invoke(cli, ['status', '--json'])
+        result = self.invoke(shared_monitor, ['status', '--json'])
         
         assert result.exit_code == 0
         # Should be valid JSON
@@ -100,30 +98,24 @@ class TestCLI:
         except json.JSONDecodeError:
             pytest.fail("Output is not valid JSON")
     
-    @patch('gpu_monitor.cli.asyncio.run')
-    def test_cli_status_specific_server(self, mock_asyncio_run):
+    def test_cli_status_specific_server(self, shared_monitor):
         """Test status command for specific server."""
         mock_cluster_status = ClusterStatus(
             servers=[],
             total_gpus=0,
             online_servers=0,
             total_servers=0,
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_cluster_status = AsyncMock(return_value=mock_cluster_status)
         
-        async def mock_status_func():
-            return mock_cluster_status
-            
-        mock_asyncio_run.side_effect = lambda func: mock_status_func()
-        
-        result = self.runner.invoke(cli, ['status', '--server', 'gpu01'])
+        result = self.invoke(shared_monitor, ['status', '--server', 'gpu01'])
         
         assert result.exit_code == 0
-        mock_asyncio_run.assert_called_once()
+        shared_monitor.get_cluster_status.assert_awaited_once_with(['gpu01'])
     
-    @patch('gpu_monitor.cli.asyncio.run')
     @patch('gpu_monitor.cli.get_current_user')
-    def test_cli_usage_command(self, mock_get_user, mock_asyncio_run):
+    def test_cli_usage_command(self, mock_get_user, shared_monitor):
         """Test usage command."""
         mock_get_user.return_value = "testuser"
         
@@ -133,22 +125,17 @@ class TestCLI:
             total_memory_used_mb=2048,
             servers_used=["gpu01"],
             processes_by_server={},
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_user_usage = AsyncMock(return_value=mock_usage)
         
-        async def mock_usage_func():
-            return mock_usage
-            
-        mock_asyncio_run.side_effect = lambda func: mock_usage_func()
-        
-        result = self.runner.invoke(cli, ['usage'])
+        result = self.invoke(shared_monitor, ['usage'])
         
         assert result.exit_code == 0
         assert "testuser" in result.output
-        mock_asyncio_run.assert_called_once()
+        shared_monitor.get_user_usage.assert_awaited_once()
     
-    @patch('gpu_monitor.cli.asyncio.run')
-    def test_cli_usage_specific_user(self, mock_asyncio_run):
+    def test_cli_usage_specific_user(self, shared_monitor):
         """Test usage command for specific user."""
         mock_usage = UserUsageSummary(
             username="otheruser",
@@ -156,22 +143,17 @@ class TestCLI:
             total_memory_used_mb=0,
             servers_used=[],
             processes_by_server={},
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_user_usage = AsyncMock(return_value=mock_usage)
         
-        async def mock_usage_func():
-            return mock_usage
-            
-        mock_asyncio_run.side_effect = lambda func: mock_usage_func()
-        
-        result = self.runner.invoke(cli, ['usage', '--user', 'otheruser'])
+        result = self.invoke(shared_monitor, ['usage', '--user', 'otheruser'])
         
         assert result.exit_code == 0
-        mock_asyncio_run.assert_called_once()
+        shared_monitor.get_user_usage.assert_awaited_once_with('otheruser', None)
     
-    @patch('gpu_monitor.cli.asyncio.run')
     @patch('gpu_monitor.cli.get_current_user')
-    def test_cli_kill_dry_run(self, mock_get_user, mock_asyncio_run):
+    def test_cli_kill_dry_run(self, mock_get_user, shared_monitor):
         """Test kill command with dry run."""
         mock_get_user.return_value = "testuser"
         
@@ -182,32 +164,26 @@ class TestCLI:
             servers_used=["gpu01"],
             processes_by_server={
                 "gpu01": [
-                    MagicMock(pid=12345, gpu_index=0, process_name="python train.py")
+                    ProcessInfo(
+                    pid=12345, username="testuser", gpu_index=0,
+                    memory_used_mb=2048, process_name="python train.py"
+                )
                 ]
             },
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_user_usage = AsyncMock(return_value=mock_usage)
+        shared_monitor.kill_user_tasks = AsyncMock()
         
-        # Mock sequence: get usage, then dry run
-        call_count = 0
-        async def mock_kill_func():
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return mock_usage
-            return {"gpu01": "Would kill 1 processes"}
-            
-        mock_asyncio_run.side_effect = lambda func: mock_kill_func()
-        
-        result = self.runner.invoke(cli, ['kill', '--dry-run'])
+        result = self.invoke(shared_monitor, ['kill', '--dry-run'])
         
         assert result.exit_code == 0
         assert "Dry run" in result.output
         assert "no processes were actually killed" in result.output
+        shared_monitor.kill_user_tasks.assert_not_awaited()
     
-    @patch('gpu_monitor.cli.asyncio.run')
     @patch('gpu_monitor.cli.get_current_user')
-    def test_cli_kill_no_processes(self, mock_get_user, mock_asyncio_run):
+    def test_cli_kill_no_processes(self, mock_get_user, shared_monitor):
         """Test kill command when no processes exist."""
         mock_get_user.return_value = "testuser"
         
@@ -217,22 +193,17 @@ class TestCLI:
             total_memory_used_mb=0,
             servers_used=[],
             processes_by_server={},
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
+        shared_monitor.get_user_usage = AsyncMock(return_value=mock_usage)
         
-        async def mock_kill_func():
-            return mock_usage
-            
-        mock_asyncio_run.side_effect = lambda func: mock_kill_func()
-        
-        result = self.runner.invoke(cli, ['kill'])
+        result = self.invoke(shared_monitor, ['kill'])
         
         assert result.exit_code == 0
         assert "No active GPU processes found" in result.output
     
-    @patch('gpu_monitor.cli.asyncio.run')
     @patch('gpu_monitor.cli.get_current_user')
-    def test_cli_kill_with_confirm(self, mock_get_user, mock_asyncio_run):
+    def test_cli_kill_with_confirm(self, mock_get_user, shared_monitor):
         """Test kill command with confirmation."""
         mock_get_user.return_value = "testuser"
         
@@ -243,27 +214,24 @@ class TestCLI:
             servers_used=["gpu01"],
             processes_by_server={
                 "gpu01": [
-                    MagicMock(pid=12345, gpu_index=0, process_name="python train.py")
+                    ProcessInfo(
+                    pid=12345, username="testuser", gpu_index=0,
+                    memory_used_mb=2048, process_name="python train.py"
+                )
                 ]
             },
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
+        )
+        shared_monitor.get_user_usage = AsyncMock(return_value=mock_usage)
+        shared_monitor.kill_user_tasks = AsyncMock(
+            return_value={"gpu01": "Killed 1 processes"}
         )
         
-        # Mock sequence: get usage, then kill result
-        call_count = 0
-        async def mock_kill_func():
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                return mock_usage
-            return {"gpu01": "Killed 1 processes"}
-            
-        mock_asyncio_run.side_effect = lambda func: mock_kill_func()
-        
-        result = self.runner.invoke(cli, ['kill', '--confirm'])
+        result = self.invoke(shared_monitor, ['kill', '--confirm'])
         
         assert result.exit_code == 0
         assert "Killing processes" in result.output
+        assert "Killed 1 processes" in result.output
     
     def test_cli_install_command(self):
         """Test install command."""
@@ -283,6 +251,7 @@ class TestCLIHelpers:
             mock_env.return_value = "testuser"
             
             from gpu_monitor.cli import get_current_user
+            get_current_user.cache_clear()
             user = get_current_user()
             
             assert user == "testuser"
@@ -300,13 +269,13 @@ class TestCLIHelpers:
         
         server_status = ServerStatus(
             server_id="gpu01", hostname="test.com", online=True,
-            gpus=[gpu], processes=[], last_updated=datetime.now(),
+            gpus=[gpu], processes=[], last_updated_ms=_NOW_MS,
             response_time_ms=100.0
         )
         
         cluster_status = ClusterStatus(
             servers=[server_status], total_gpus=1, online_servers=1,
-            total_servers=1, last_updated=datetime.now()
+            total_servers=1, last_updated_ms=_NOW_MS
         )
         
         formatted = format_gpu_status(cluster_status)
@@ -329,7 +298,7 @@ class TestCLIHelpers:
         usage = UserUsageSummary(
             username="testuser", total_processes=1, total_memory_used_mb=2048,
             servers_used=["gpu01"], processes_by_server={"gpu01": [process]},
-            last_updated=datetime.now()
+            last_updated_ms=_NOW_MS
         )
         
         formatted = format_user_usage(usage)
@@ -1,11 +1,11 @@
 """Test GPU Monitor core functionality."""
 
 import pytest
+import time
 import asyncio
 from unittest.mock import AsyncMock, patch, MagicMock
-from datetime import datetime
 
-from gpu_monitor.core import GPUMonitor
+from gpu_monitor.core import GPUMonitor, _SCRIPT_SEP
 from gpu_monitor.models import ServerStatus, GPUInfo, ProcessInfo
 
 
@@ -24,21 +24,78 @@ class TestGPUMonitor:
             monitor = GPUMonitor()
             assert len(monitor.config.servers) >= 1  # Default config
     
-    def test_cache_validation(self, sample_config):
-        """Test cache validation logic."""
+    def test_load_config_memoized(self, config_file):
+        """Test that repeated loads of an unchanged config reuse the parse."""
+        import os
+
+        first = GPUMonitor(config_file)
+        second = GPUMonitor(config_file)
+        assert first.config is second.config
+
+        # Bumping the mtime invalidates the memoized entry
+        stat = os.stat(config_file)
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+        third = GPUMonitor(config_file)
+        assert third.config is not first.config
+
+    def test_cache_expiry(self, sample_config):
+        """Test that cached entries expire after the configured TTL."""
+        from cachetools import TTLCache
+
         monitor = GPUMonitor()
         monitor.config = sample_config
-        
+
+        clock = [0.0]
+        monitor._cache = TTLCache(maxsize=8, ttl=5, timer=lambda: clock[0])
+
         # Test cache miss
-        assert not monitor._is_cache_valid("test_key", 30)
-        
+        assert monitor._cache.get("test_key") is None
+
         # Set cache and test hit
-        monitor._set_cache("test_key", "test_data")
-        assert monitor._is_cache_valid("test_key", 30)
-        
+        monitor._cache["test_key"] = "test_data"
+        assert monitor._cache.get("test_key") == "test_data"
+
         # Test cache expiry
-        assert not monitor._is_cache_valid("test_key", 0)
+        clock[0] += 6
+        assert monitor._cache.get("test_key") is None
     
+    def test_persistent_cache_shared_across_monitors(self, sample_config, tmp_path):
+        """Test that the disk cache tier survives across monitor instances."""
+        from diskcache import Cache
+
+        status = ServerStatus(
+            server_id="test-gpu01", hostname="test1.example.com", online=True,
+            last_updated_ms=int(time.time() * 1000), response_time_ms=100.0
+        )
+
+        monitor = GPUMonitor()
+        monitor.config = sample_config
+        monitor._disk_cache = Cache(str(tmp_path))
+        monitor._cache_store("server_status_test-gpu01", status)
+
+        other = GPUMonitor()
+        other.config = sample_config
+        other._disk_cache = Cache(str(tmp_path))
+
+        cached = other._cache_lookup("server_status_test-gpu01")
+        assert cached is not None
+        assert cached.server_id == "test-gpu01"
+
+    def test_adaptive_cache_ttl(self, sample_config):
+        """Test that cache TTL scales with response time, bounded by policy."""
+        monitor = GPUMonitor()
+        monitor.config = sample_config
+
+        fast = ServerStatus(
+            server_id="test-gpu01", hostname="test1.example.com", online=True,
+            last_updated_ms=int(time.time() * 1000), response_time_ms=100.0
+        )
+        slow = fast.model_copy(update={"response_time_ms": 60000.0})
+
+        # 100ms -> below the floor, clamped to min; 60s -> clamped to max
+        assert monitor._ttu("key", fast, now=0.0) == 10
+        assert monitor._ttu("key", slow, now=0.0) == 120
+
     def test_parse_nvidia_smi_output(self, sample_config, mock_nvidia_smi_output):
         """Test parsing nvidia-smi output."""
         monitor = GPUMonitor()
@@ -63,62 +120,89 @@ class TestGPUMonitor:
         """Test successful SSH command execution."""
         monitor = GPUMonitor()
         monitor.config = sample_config
-        
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            # Mock successful subprocess
-            mock_process = AsyncMock()
-            mock_process.returncode = 0
-            mock_process.communicate.return_value = (b"success output", b"")
-            mock_subprocess.return_value = mock_process
-            
+
+        with patch('gpu_monitor.core.asyncssh.connect', new_callable=AsyncMock) as mock_connect:
+            # Mock successful remote command
+            mock_conn = AsyncMock()
+            mock_result = MagicMock()
+            mock_result.exit_status = 0
+            mock_result.stdout = "success output"
+            mock_result.stderr = ""
+            mock_conn.run.return_value = mock_result
+            mock_connect.return_value = mock_conn
+
             success, output, response_time = await monitor._run_ssh_command(
                 "test.com", "echo hello"
             )
-            
+
             assert success is True
             assert output == "success output"
             assert response_time > 0
-    
+
     @pytest.mark.asyncio
     async def test_run_ssh_command_failure(self, sample_config):
         """Test failed SSH command execution."""
         monitor = GPUMonitor()
         monitor.config = sample_config
-        
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
-            # Mock failed subprocess
-            mock_process = AsyncMock()
-            mock_process.returncode = 1
-            mock_process.communicate.return_value = (b"", b"connection refused")
-            mock_subprocess.return_value = mock_process
-            
+
+        with patch('gpu_monitor.core.asyncssh.connect', new_callable=AsyncMock) as mock_connect:
+            # Mock failed remote command
+            mock_conn = AsyncMock()
+            mock_result = MagicMock()
+            mock_result.exit_status = 1
+            mock_result.stdout = ""
+            mock_result.stderr = "connection refused"
+            mock_conn.run.return_value = mock_result
+            mock_connect.return_value = mock_conn
+
             success, output, response_time = await monitor._run_ssh_command(
                 "test.com", "echo hello"
             )
-            
+
             assert success is False
             assert "connection refused" in output
             assert response_time > 0
-    
+
     @pytest.mark.asyncio
     async def test_run_ssh_command_timeout(self, sample_config):
         """Test SSH command timeout."""
         monitor = GPUMonitor()
         monitor.config = sample_config
-        
-        with patch('asyncio.create_subprocess_exec') as mock_subprocess:
+
+        with patch('gpu_monitor.core.asyncssh.connect', new_callable=AsyncMock) as mock_connect:
             # Mock timeout
-            mock_process = AsyncMock()
-            mock_process.communicate.side_effect = asyncio.TimeoutError()
-            mock_subprocess.return_value = mock_process
-            
+            mock_conn = AsyncMock()
+            mock_conn.run.side_effect = asyncio.TimeoutError()
+            mock_connect.return_value = mock_conn
+
             success, output, response_time = await monitor._run_ssh_command(
                 "test.com", "echo hello"
             )
-            
+
             assert success is False
             assert "timeout" in output.lower()
             assert response_time > 0
+
+    @pytest.mark.asyncio
+    async def test_run_ssh_command_reuses_connection(self, sample_config):
+        """Test that pooled connections are reused across commands."""
+        monitor = GPUMonitor()
+        monitor.config = sample_config
+
+        with patch('gpu_monitor.core.asyncssh.connect', new_callable=AsyncMock) as mock_connect:
+            mock_conn = AsyncMock()
+            mock_result = MagicMock()
+            mock_result.exit_status = 0
+            mock_result.stdout = "ok"
+            mock_result.stderr = ""
+            mock_conn.run.return_value = mock_result
+            mock_connect.return_value = mock_conn
+
+            await monitor._run_ssh_command("test.com", "echo one")
+            await monitor._run_ssh_command("test.com", "echo two")
+
+            mock_connect.assert_called_once()
+            assert mock_conn.run.call_count == 2
     
     @pytest.mark.asyncio
     async def test_get_server_status_online(self, sample_config, mock_nvidia_smi_output):
@@ -153,6 +237,32 @@ class TestGPUMonitor:
             assert len(status.gpus) == 0
             assert status.response_time_ms == 50.0
     
+    @pytest.mark.asyncio
+    async def test_get_server_status_stale_fallback(self, sample_config, mock_nvidia_smi_output):
+        """Test serving last-known status when SSH fails."""
+        monitor = GPUMonitor()
+        monitor.config = sample_config
+
+        with patch.object(monitor, '_run_ssh_command') as mock_ssh:
+            mock_ssh.return_value = (True, mock_nvidia_smi_output, 100.0)
+            status = await monitor._get_server_status(sample_config.servers[0])
+            assert status.stale is False
+            # Prime the memoized JSON so the fallback below proves the
+            # stale copy does not inherit the pre-outage serialization
+            status.to_json()
+
+        monitor._cache.clear()
+
+        with patch.object(monitor, '_run_ssh_command') as mock_ssh:
+            mock_ssh.return_value = (False, "Connection refused", 50.0)
+            status = await monitor._get_server_status(sample_config.servers[0])
+
+            assert status.stale is True
+            assert status.online is True
+            assert len(status.gpus) == 2
+            assert status.error_message == "Connection refused"
+            assert '"stale":true' in status.to_json()
+
     @pytest.mark.asyncio
     async def test_get_cluster_status_all_servers(self, sample_config, mock_nvidia_smi_output):
         """Test getting cluster status for all servers."""
@@ -195,8 +305,8 @@ class TestGPUMonitor:
             usage = await monitor.get_user_usage("testuser")
             
             assert usage.username == "testuser"
-            assert usage.total_processes == 2  # testuser has 2 processes
-            assert usage.total_memory_used_mb == 6144  # 2048 + 4096
+            assert usage.total_processes == 4  # testuser has 2 processes per server
+            assert usage.total_memory_used_mb == 12288  # (2048 + 4096) * 2
             assert len(usage.servers_used) == 2
     
     @pytest.mark.asyncio
@@ -216,13 +326,17 @@ class TestGPUMonitor:
         monitor = GPUMonitor()
         monitor.config = sample_config
         
+        # Sentinel-framed transcript for the batched kill + refresh script:
+        # empty kill output, exit 0, then the status refresh, exit 0
+        kill_script_output = f"{_SCRIPT_SEP}0\n{mock_nvidia_smi_output}\n{_SCRIPT_SEP}0"
+
         with patch.object(monitor, '_run_ssh_command') as mock_ssh:
-            # First call: get processes, second call: kill command
+            # First two calls: discovery sweep, then one batched kill script per server
             mock_ssh.side_effect = [
                 (True, mock_nvidia_smi_output, 100.0),
                 (True, mock_nvidia_smi_output, 100.0),
-                (True, "", 50.0),  # kill command success
-                (True, "", 50.0)   # kill command success
+                (True, kill_script_output, 50.0),
+                (True, kill_script_output, 50.0)
             ]
             
             result = await monitor.kill_user_tasks("testuser", confirm=True)
@@ -241,7 +355,9 @@ class TestGPUMonitor:
         
         with patch.object(monitor, '_run_ssh_command') as mock_ssh:
             # Return empty nvidia-smi output (no processes)
-            mock_ssh.return_value = (True, "GPU 0: Tesla V100, 0% utilization, 0/16000 MB", 100.0)
+            mock_ssh.return_value = (
+                True, "0, GPU-aaaa1111, Tesla V100, 0, 0, 16000, 30, 50\n---PROCESSES---", 100.0
+            )
             
             result = await monitor.kill_user_tasks("testuser", confirm=True)
             
@@ -1,7 +1,7 @@
 """Test GPU Monitor data models."""
 
 import pytest
-from datetime import datetime
+import time
 from pydantic import ValidationError
 
 from gpu_monitor.models import (
@@ -36,15 +36,15 @@ class TestClusterConfig:
     def test_valid_cluster_config(self, sample_config):
         """Test creating a valid cluster config."""
         assert len(sample_config.servers) == 2
-        assert sample_config.settings["cache_ttl"] == 5
+        assert sample_config.settings.cache_ttl == 5
     
     def test_default_settings(self):
         """Test cluster config with default settings."""
         config = ClusterConfig(servers=[
             ServerConfig(id="gpu01", hostname="test.com")
         ])
-        assert "cache_ttl" in config.settings
-        assert config.settings["cache_ttl"] == 30
+        assert config.settings.cache_ttl == 30
+        assert config.settings.ssh_timeout == 5
 
 
 class TestGPUInfo:
@@ -112,7 +112,7 @@ class TestServerStatus:
             online=True,
             gpus=[gpu],
             processes=[],
-            last_updated=datetime.now(),
+            last_updated_ms=int(time.time() * 1000),
             response_time_ms=150.5
         )
         assert status.online is True
@@ -126,7 +126,7 @@ class TestServerStatus:
             hostname="gpu01.example.com",
             online=False,
             error_message="Connection refused",
-            last_updated=datetime.now()
+            last_updated_ms=int(time.time() * 1000)
         )
         assert status.online is False
         assert status.error_message == "Connection refused"
@@ -148,7 +148,7 @@ class TestUserUsageSummary:
             total_memory_used_mb=2048,
             servers_used=["gpu01"],
             processes_by_server={"gpu01": [process]},
-            last_updated=datetime.now()
+            last_updated_ms=int(time.time() * 1000)
         )
         assert summary.username == "testuser"
         assert summary.total_processes == 1
@@ -162,14 +162,14 @@ class TestClusterStatus:
         """Test creating cluster status."""
         server_status = ServerStatus(
             server_id="gpu01", hostname="gpu01.example.com",
-            online=True, last_updated=datetime.now()
+            online=True, last_updated_ms=int(time.time() * 1000)
         )
         cluster = ClusterStatus(
             servers=[server_status],
             total_gpus=0,
             online_servers=1,
             total_servers=1,
-            last_updated=datetime.now()
+            last_updated_ms=int(time.time() * 1000)
         )
         assert cluster.online_servers == 1
         assert cluster.total_servers == 1